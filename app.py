@@ -1,25 +1,27 @@
 import os
+import re
 import json
-import requests
-import logging
 import time
-import argparse
-from sumy.parsers.plaintext import PlaintextParser
-from sumy.nlp.tokenizers import Tokenizer
-from sumy.summarizers.lsa import LsaSummarizer
-from selenium import webdriver
-from selenium.webdriver.chrome.service import Service
-from selenium.webdriver.chrome.options import Options
-from selenium.webdriver.common.by import By
-from selenium.webdriver.common.keys import Keys
-from selenium.webdriver.support.ui import WebDriverWait
-from selenium.webdriver.support import expected_conditions as EC
+import hashlib
+import random
+import asyncio
+import aiohttp
+import logging
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from itertools import chain
 import nltk
 
-# Ensure the necessary NLTK data is downloaded
-nltk.download('vader_lexicon', quiet=True)
+# Ensure the necessary NLTK data is downloaded (only hits the network when it is missing)
+try:
+    nltk.data.find('sentiment/vader_lexicon.zip')
+except LookupError:
+    nltk.download('vader_lexicon', quiet=True)
 from nltk.sentiment.vader import SentimentIntensityAnalyzer
 
+# Build the VADER analyzer once; constructing it reloads the whole lexicon
+_SID = SentimentIntensityAnalyzer()
+
 # ----- Load Configuration from config.json -----
 CONFIG_FILE = "config.json"
 if not os.path.exists(CONFIG_FILE):
@@ -31,14 +33,29 @@ with open(CONFIG_FILE, "r") as f:
 NEWS_API_KEY = config.get("news_api_key")
 COUNTRY = config.get("country", "us")
 CATEGORY = config.get("category", "general")
+# NewsAPI's default is "general", so that category is simply left out of the query
+_CATEGORY_PARAM = CATEGORY if CATEGORY and CATEGORY.lower() != "general" else None
 MAX_HEADLINES_PER_SOURCE = config.get("max_headlines_per_source", 3)
+MAX_SOURCES = config.get("max_sources")
 CHROME_DRIVER_PATH = config.get("chrome_driver_path")
 REMOTE_DEBUGGER_ADDRESS = config.get("remote_debugger_address", "127.0.0.1:9222")
+# Extra Chrome instances (one debugger port each, each linked to WhatsApp) used for parallel sends
+REMOTE_DEBUGGER_ADDRESSES = config.get("remote_debugger_addresses", [REMOTE_DEBUGGER_ADDRESS])
+# WhatsApp Web allows one session per linked device, so this is capped by the number of addresses above
+MAX_PARALLEL_SENDS = config.get("max_parallel_sends", 1)
 CONTACTS = config.get("contacts", [])
+# Name of an existing WhatsApp broadcast list; when set, one send reaches every recipient
+BROADCAST_LIST = config.get("broadcast_list")
 WHATSAPP_URL = config.get("whatsapp_url", "https://web.whatsapp.com")
 LOG_FILE = config.get("logging_file", "news_agent.log")
+# Seconds between runs; when unset the job runs once and exits
+RUN_INTERVAL_SECONDS = config.get("run_interval_seconds")
 # Soccer league ID for fetching matches (e.g., 4328 for English Premier League)
 SOCCER_LEAGUE_ID = config.get("soccer_league_id")
+# On-disk cache for slow-changing endpoints (fixtures)
+CACHE_DIR = os.path.expanduser(config.get("cache_dir", "~/.cache/news_agent"))
+SOCCER_CACHE_TTL = config.get("soccer_cache_ttl", 12 * 60 * 60)
+QUOTES_FILE = config.get("quotes_file", "quotes.json")
 # --------------------------------------------------
 
 # Setup logging (to file and console)
@@ -51,184 +68,390 @@ logging.basicConfig(
     ]
 )
 
-def fetch_news():
+# All fetches share one aiohttp session per run (reused across jobs); transient failures are retried with backoff
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=3)
+HTTP_RETRIES = 3
+HTTP_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+NEWS_API_URL = "https://newsapi.org/v2/top-headlines"
+SOCCER_API_URL = "https://www.thesportsdb.com/api/v1/json/1/eventsnextleague.php"
+
+def _load_quotes():
+    # Quotes ship with the app, so picking one never touches the network
+    try:
+        with open(QUOTES_FILE, "r") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Could not load quotes from {QUOTES_FILE}: {str(e)}")
+        return []
+
+_QUOTES = _load_quotes()
+
+async def _get_json(session, url, params=None, object_hook=None):
+    # aiohttp rejects None query values, so drop them (e.g. an unset category)
+    params = {k: v for k, v in (params or {}).items() if v is not None}
+    for attempt in range(HTTP_RETRIES + 1):
+        try:
+            async with session.get(url, params=params) as response:
+                if response.status in RETRY_STATUSES and attempt < HTTP_RETRIES:
+                    await asyncio.sleep(HTTP_BACKOFF * 2 ** attempt)
+                    continue
+                response.raise_for_status()
+                return json.loads(await response.text(), object_hook=object_hook)
+        except (aiohttp.ClientConnectionError, asyncio.TimeoutError):
+            if attempt >= HTTP_RETRIES:
+                raise
+            await asyncio.sleep(HTTP_BACKOFF * 2 ** attempt)
+
+async def _cached_get(session, url, ttl_seconds, params=None):
+    # Serve the JSON body from disk if it is younger than ttl_seconds, otherwise fetch and store it
+    cache_key = url + json.dumps(params or {}, sort_keys=True)
+    cache_path = os.path.join(CACHE_DIR, hashlib.md5(cache_key.encode("utf-8")).hexdigest() + ".json")
+    try:
+        with open(cache_path, "r") as f:
+            cached = json.load(f)
+        if time.time() - cached["ts"] < ttl_seconds:
+            return cached["body"]
+    except (OSError, ValueError, KeyError):
+        pass
+    
+    body = await _get_json(session, url, params=params)
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        with open(cache_path, "w") as f:
+            json.dump({"ts": time.time(), "body": body}, f)
+    except OSError as e:
+        logging.warning(f"Could not write cache file {cache_path}: {str(e)}")
+    return body
+
+def _slim_article(obj):
+    # Articles are the only objects carrying both keys; keep just what the summary reads
+    if "title" in obj and "source" in obj:
+        return {"source": obj["source"], "title": obj["title"]}
+    return obj
+
+async def fetch_news(session):
     logging.info("Fetching news from NewsAPI")
-    url = f"https://newsapi.org/v2/top-headlines?country={COUNTRY}&apiKey={NEWS_API_KEY}"
-    if CATEGORY and CATEGORY.lower() != "general":
-        url += f"&category={CATEGORY}"
+    params = {
+        "country": COUNTRY,
+        "apiKey": NEWS_API_KEY,
+        "category": _CATEGORY_PARAM,
+    }
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            articles = response.json().get("articles", [])
-            logging.info(f"Fetched {len(articles)} articles.")
-            return articles
-        else:
-            logging.error(f"Failed to fetch news. Status code: {response.status_code}")
-            return []
+        data = await _get_json(session, NEWS_API_URL, params=params, object_hook=_slim_article)
+        articles = data.get("articles", [])
+        logging.info(f"Fetched {len(articles)} articles.")
+        return articles
+    except aiohttp.ClientResponseError as e:
+        logging.error(f"Failed to fetch news. Status code: {e.status}")
+        return []
     except Exception as e:
         logging.error(f"Exception during news fetching: {str(e)}")
         return []
 
-def group_articles_by_source(articles, max_per_source=3):
-    grouped = {}
+def group_articles_by_source(articles, max_per_source=3, max_sources=None):
+    grouped = defaultdict(list)
+    saturated = set()
     for article in articles:
-        source = article.get("source", {}).get("name", "Unknown Source")
         headline = article.get("title", "").strip()
         if not headline:
             continue
-        if source not in grouped:
-            grouped[source] = []
-        if len(grouped[source]) < max_per_source:
-            grouped[source].append(headline)
+        source = article.get("source", {}).get("name", "Unknown Source")
+        if source in saturated:
+            continue
+        if max_sources is not None and source not in grouped and len(grouped) >= max_sources:
+            continue
+        headlines = grouped[source]
+        if len(headlines) < max_per_source:
+            headlines.append(headline)
+        if len(headlines) >= max_per_source:
+            saturated.add(source)
+            # Stop scanning once every source we can take is full
+            if max_sources is not None and len(saturated) >= max_sources:
+                break
     return grouped
 
+# Standard VADER compound-score cut-offs
+_POS_THRESHOLD = 0.05
+_NEG_THRESHOLD = -0.05
+
 def analyze_sentiment(text):
-    sid = SentimentIntensityAnalyzer()
-    scores = sid.polarity_scores(text)
+    scores = _SID.polarity_scores(text)
     compound = scores.get("compound", 0)
-    if compound >= 0.05:
+    if compound >= _POS_THRESHOLD:
         return "Overall Positive"
-    elif compound <= -0.05:
+    elif compound <= _NEG_THRESHOLD:
         return "Overall Negative"
     else:
         return "Neutral"
 
 def fetch_inspirational_quote():
-    try:
-        response = requests.get("https://zenquotes.io/api/random")
-        if response.status_code == 200:
-            data = response.json()[0]
-            quote = data.get("q", "")
-            author = data.get("a", "")
-            return f"\"{quote}\" - {author}"
-        else:
-            logging.warning("Could not fetch inspirational quote. Status code: " + str(response.status_code))
-            return ""
-    except Exception as e:
-        logging.error(f"Error fetching inspirational quote: {str(e)}")
+    if not _QUOTES:
         return ""
+    data = random.choice(_QUOTES)
+    return f"\"{data.get('q', '')}\" - {data.get('a', '')}"
 
-def fetch_soccer_matches(league_id):
+async def fetch_soccer_matches(session, league_id):
     logging.info(f"Fetching soccer matches for league id: {league_id}")
-    url = f"https://www.thesportsdb.com/api/v1/json/1/eventsnextleague.php?id={league_id}"
     try:
-        response = requests.get(url)
-        if response.status_code == 200:
-            data = response.json()
-            events = data.get("events", [])
-            logging.info(f"Fetched {len(events)} upcoming soccer matches.")
-            return events
-        else:
-            logging.error(f"Failed to fetch soccer matches. Status code: {response.status_code}")
-            return []
+        data = await _cached_get(session, SOCCER_API_URL, SOCCER_CACHE_TTL, params={"id": league_id})
+        events = data.get("events") or []
+        logging.info(f"Fetched {len(events)} upcoming soccer matches.")
+        return events
+    except aiohttp.ClientResponseError as e:
+        logging.error(f"Failed to fetch soccer matches. Status code: {e.status}")
+        return []
     except Exception as e:
         logging.error(f"Exception during soccer matches fetching: {str(e)}")
         return []
 
-def create_formatted_soccer_matches_message(events):
-    
-    if not events:
-        return "Upcoming Soccer Matches:\n* No upcoming soccer matches."
-    lines = ["Upcoming Soccer Matches:"]
+def _open_http_session():
+    # One connection pool for every endpoint, kept for the whole run so scheduled jobs reuse it
+    connector = aiohttp.TCPConnector(limit=8, ttl_dns_cache=300)
+    return aiohttp.ClientSession(timeout=HTTP_TIMEOUT, connector=connector)
+
+async def fetch_all(session, league_id=None):
+    # The fetches are independent so run them concurrently
+    if league_id:
+        return await asyncio.gather(fetch_news(session), fetch_soccer_matches(session, league_id))
+    return await fetch_news(session), None
+
+def _iter_soccer_lines(events):
+    yield "Upcoming Soccer Matches:"
     for event in events:
         home = event.get("strHomeTeam", "N/A")
         away = event.get("strAwayTeam", "N/A")
         date = event.get("dateEvent", "")
         time_event = event.get("strTime", "")
-        lines.append(f"* {home} vs {away} - {date} {time_event}")
-    return "\n".join(lines)
+        yield f"* {home} vs {away} - {date} {time_event}"
 
-def create_formatted_message_from_grouping(grouped_articles, sentiment, quote, soccer_section=""):
+def create_formatted_soccer_matches_message(events):
     
-    lines = ["Daily News Summary", ""]
+    if not events:
+        return "Upcoming Soccer Matches:\n* No upcoming soccer matches."
+    return "\n".join(_iter_soccer_lines(events))
+
+def _iter_lines(grouped_articles, sentiment, quote, soccer_section):
+    yield "Daily News Summary"
+    yield ""
     for source, headlines in grouped_articles.items():
-        lines.append(f"{source}:")
+        yield f"{source}:"
         for headline in headlines:
-            if not headline.endswith('.'):
-                headline += '.'
-            lines.append(f"* {headline}")
-        lines.append("")
+            yield "* " + (headline if headline.endswith('.') else headline + '.')
+        yield ""
     if soccer_section:
-        lines.append(soccer_section)
-        lines.append("")
-    lines.append(f"Overall Sentiment: {sentiment}")
+        yield soccer_section
+        yield ""
+    yield f"Overall Sentiment: {sentiment}"
     if quote:
-        lines.append(f"Inspirational Quote: {quote}")
-    lines.append("")
-    lines.append("Have a great day!")
-    return "\n".join(lines)
+        yield f"Inspirational Quote: {quote}"
+    yield ""
+    yield "Have a great day!"
+
+def create_formatted_message_from_grouping(grouped_articles, sentiment, quote, soccer_section=""):
+    
+    return "\n".join(_iter_lines(grouped_articles, sentiment, quote, soccer_section))
+
+_DRIVERS = {}
+
+def open_whatsapp(debugger_address=REMOTE_DEBUGGER_ADDRESS):
+    # Selenium is only needed for sending, so import it lazily
+    from selenium import webdriver
+    from selenium.webdriver.chrome.service import Service
+    from selenium.webdriver.chrome.options import Options
+    
+    logging.info(f"Opening WhatsApp Web on {debugger_address}.")
+    service = Service(CHROME_DRIVER_PATH)
+    chrome_options = Options()
+    chrome_options.add_experimental_option("debuggerAddress", debugger_address)
+    driver = webdriver.Chrome(service=service, options=chrome_options)
+    # Rely on explicit waits only so they don't stack with an implicit one
+    driver.implicitly_wait(0)
+    # No <body> wait here: the element waits in send_whatsapp_message are the real readiness check
+    driver.get(WHATSAPP_URL)
+    return driver
+
+def _get_driver(debugger_address=REMOTE_DEBUGGER_ADDRESS):
+    # Reuse the WhatsApp Web session across jobs, reopening it if Chrome went away
+    driver = _DRIVERS.get(debugger_address)
+    if driver is not None:
+        try:
+            driver.current_url
+            return driver
+        except Exception as e:
+            logging.warning(f"WhatsApp Web session on {debugger_address} lost, reopening: {str(e)}")
+            _close_driver(debugger_address)
+    driver = _DRIVERS[debugger_address] = open_whatsapp(debugger_address)
+    return driver
 
-def send_whatsapp_message(contact_name, message):
+def _close_driver(debugger_address):
+    driver = _DRIVERS.pop(debugger_address, None)
+    if driver is not None:
+        try:
+            driver.quit()
+        except Exception:
+            pass
+
+def _close_drivers():
+    for debugger_address in list(_DRIVERS):
+        _close_driver(debugger_address)
+
+def _send_to_contacts(driver, contacts, message):
+    for contact in contacts:
+        send_whatsapp_message(driver, contact, message)
+
+def _css_string(value):
+    # Escape a value for use inside a double-quoted CSS attribute selector
+    return value.replace("\\", "\\\\").replace('"', '\\"')
+
+def send_whatsapp_message(driver, contact, message):
+    from selenium.webdriver.common.by import By
+    from selenium.webdriver.common.keys import Keys
+    from selenium.webdriver.support.ui import WebDriverWait
+    from selenium.webdriver.support import expected_conditions as EC
+    from selenium.common.exceptions import TimeoutException, StaleElementReferenceException
+    
+    # Contacts are either a plain name or {"name": ..., "phone": "+1..."}
+    if isinstance(contact, dict):
+        contact_name = contact.get("name") or contact.get("phone")
+        # Keep digits only so "+1 555-123-4567" or a numeric JSON value both work in the send link
+        phone = re.sub(r"\D", "", str(contact.get("phone") or ""))
+    else:
+        contact_name = contact
+        phone = None
+    
     logging.info(f"Sending WhatsApp message to {contact_name}.")
     try:
-        service = Service(CHROME_DRIVER_PATH)
-        chrome_options = Options()
-        chrome_options.add_experimental_option("debuggerAddress", REMOTE_DEBUGGER_ADDRESS)
-        driver = webdriver.Chrome(service=service, options=chrome_options)
-        driver.get(WHATSAPP_URL)
-        
-        # Wait for WhatsApp Web to load
-        WebDriverWait(driver, 20).until(EC.presence_of_element_located((By.TAG_NAME, "body")))
-        logging.info("WhatsApp Web loaded.")
-        
-        # Locate the search box
-        search_box = WebDriverWait(driver, 20).until(
-            EC.presence_of_element_located(
-                (By.XPATH, "//div[@role='textbox' and @aria-label='Search input textbox']")
+        if phone:
+            # Open the chat directly instead of going through the sidebar search
+            driver.get(f"{WHATSAPP_URL}/send?phone={phone}")
+        else:
+            # Locate the search box
+            search_box = WebDriverWait(driver, 20).until(
+                EC.presence_of_element_located(
+                    (By.CSS_SELECTOR, 'div[role="textbox"][aria-label="Search input textbox"]')
+                )
             )
-        )
-        search_box.click()
-        search_box.send_keys(contact_name)
-        time.sleep(2)
-        
-        # Click the contact (ensure exact name match)
-        contact = driver.find_element(By.XPATH, f'//span[@title="{contact_name}"]')
-        contact.click()
-        time.sleep(2)
+            search_box.click()
+            # Clear any name left over from the previous contact
+            search_box.send_keys(Keys.CONTROL + "a")
+            search_box.send_keys(Keys.DELETE)
+            search_box.send_keys(contact_name)
+            
+            # Click the contact (ensure exact name match) as soon as the search results show it
+            contact_item = WebDriverWait(driver, 10).until(
+                EC.element_to_be_clickable((By.CSS_SELECTOR, f'span[title="{_css_string(contact_name)}"]'))
+            )
+            contact_item.click()
         
         # Locate the message input box
         message_box = WebDriverWait(driver, 20).until(
-            EC.element_to_be_clickable((By.XPATH, "//footer//div[@contenteditable='true']"))
+            EC.element_to_be_clickable((By.CSS_SELECTOR, 'footer div[contenteditable="true"]'))
         )
         
-        # Send the message using SHIFT+ENTER for line breaks so that all lines are in one bubble
-        for line in message.split("\n"):
-            message_box.send_keys(line)
-            message_box.send_keys(Keys.SHIFT, Keys.ENTER)
+        # Insert the whole message in one call; inserted line breaks stay in the same bubble
+        message_box.click()
+        driver.execute_cdp_cmd("Input.insertText", {"text": message})
         # Finally, press ENTER to send the entire message bubble
         message_box.send_keys(Keys.ENTER)
         
+        # Wait for the box to clear (the bubble was posted), then for its pending clock to go away.
+        # Ticks on older messages in the chat can't be told apart from ours, so don't wait on those.
+        def composer_cleared(d):
+            try:
+                return not message_box.text.strip()
+            except StaleElementReferenceException:
+                # WhatsApp re-rendered the composer after posting, so it is cleared too
+                return True
+        
+        try:
+            WebDriverWait(driver, 10).until(composer_cleared)
+            WebDriverWait(driver, 10).until(
+                EC.invisibility_of_element_located((By.CSS_SELECTOR, 'span[data-icon="msg-time"]'))
+            )
+        except TimeoutException:
+            logging.warning(f"Message to {contact_name} still pending after waiting.")
+        
         logging.info(f"Message sent to {contact_name}.")
-        time.sleep(5)
-        driver.quit()
     except Exception as e:
         logging.error(f"Error sending message to {contact_name}: {str(e)}")
 
-def job():
+def _send_all(message):
+    # Broadcast lists show up in the same search UI as regular chats
+    recipients = [BROADCAST_LIST] if BROADCAST_LIST else CONTACTS
+    if not recipients:
+        # Don't attach to (and navigate) the user's Chrome when there is nobody to send to
+        logging.warning("No contacts or broadcast list configured; skipping message sending.")
+        return
+    workers = min(max(1, MAX_PARALLEL_SENDS), len(REMOTE_DEBUGGER_ADDRESSES), len(recipients))
+    drivers = []
+    for debugger_address in REMOTE_DEBUGGER_ADDRESSES[:workers]:
+        try:
+            drivers.append(_get_driver(debugger_address))
+        except Exception as e:
+            logging.error(f"Error opening WhatsApp Web on {debugger_address}: {str(e)}")
+    if not drivers:
+        return
+    
+    if len(drivers) == 1:
+        _send_to_contacts(drivers[0], recipients, message)
+    else:
+        # Each worker drives its own Chrome session through its share of the contacts
+        with ThreadPoolExecutor(max_workers=len(drivers)) as executor:
+            futures = [
+                executor.submit(_send_to_contacts, driver, recipients[i::len(drivers)], message)
+                for i, driver in enumerate(drivers)
+            ]
+            for future in futures:
+                future.result()
+
+async def async_job(session):
     logging.info("Job started.")
-    articles = fetch_news()
+    articles, soccer_events = await fetch_all(session, SOCCER_LEAGUE_ID)
+    quote = fetch_inspirational_quote()
+    
     if not articles:
         logging.warning("No articles fetched; skipping message sending.")
         return
-    grouped_articles = group_articles_by_source(articles, max_per_source=MAX_HEADLINES_PER_SOURCE)
+    grouped_articles = group_articles_by_source(
+        articles, max_per_source=MAX_HEADLINES_PER_SOURCE, max_sources=MAX_SOURCES
+    )
     
     # Flatten headlines for sentiment analysis
-    flattened_text = " ".join([" ".join(headlines) for headlines in grouped_articles.values()])
+    flattened_text = " ".join(chain.from_iterable(grouped_articles.values()))
     sentiment = analyze_sentiment(flattened_text)
     
-    # Fetch an inspirational quote
-    quote = fetch_inspirational_quote()
+    soccer_section = create_formatted_soccer_matches_message(soccer_events) if SOCCER_LEAGUE_ID else ""
     
-    formatted_message = create_formatted_message_from_grouping(grouped_articles, sentiment, quote)
+    formatted_message = create_formatted_message_from_grouping(grouped_articles, sentiment, quote, soccer_section)
     logging.info("Formatted message:\n" + formatted_message)
     
-    for contact in CONTACTS:
-        send_whatsapp_message(contact, formatted_message)
+    # Selenium blocks, so keep the send path synchronous and off the event loop
+    await asyncio.to_thread(_send_all, formatted_message)
     logging.info("Job completed.")
 
+async def _run():
+    # A single event loop and HTTP session for the whole run, so connections and DNS lookups
+    # carry over between scheduled jobs
+    async with _open_http_session() as session:
+        if not RUN_INTERVAL_SECONDS:
+            # Run the job once
+            await async_job(session)
+            return
+        # Keep running on a fixed interval, sharing one WhatsApp Web session between jobs
+        while True:
+            try:
+                await async_job(session)
+            except Exception:
+                # One bad run shouldn't stop the schedule
+                logging.exception("Job failed.")
+            await asyncio.sleep(RUN_INTERVAL_SECONDS)
+
 def main():
-    # Run the job once
-    job()
+    try:
+        asyncio.run(_run())
+    finally:
+        _close_drivers()
 
 if __name__ == "__main__":
     main()